@@ -1,6 +1,5 @@
 import os
 import streamlit as st
-from datetime import datetime
 from dotenv import load_dotenv
 
 import google.generativeai as genai
@@ -11,11 +10,21 @@ from src.chatbot import EnhancedChatbot
 # Load environment variables from .env file (if available)
 load_dotenv('.env')
 
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-genai.configure(api_key=GOOGLE_API_KEY)
+@st.cache_resource
+def configure_genai():
+    """Configure the Gemini client once per process."""
+    genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
 
-config = ChatbotConfig(google_api_key=GOOGLE_API_KEY)
-chatbot = EnhancedChatbot(config)
+
+@st.cache_resource
+def get_chatbot():
+    """Build the chatbot once per process instead of on every rerun."""
+    config = ChatbotConfig(google_api_key=os.getenv("GOOGLE_API_KEY"))
+    return EnhancedChatbot(config)
+
+
+configure_genai()
+chatbot = get_chatbot()
 
 # Set page config
 st.set_page_config(
@@ -24,44 +33,6 @@ st.set_page_config(
     layout="centered"
 )
 
-# Custom CSS for styling
-st.markdown("""
-<style>
-    .user-message {
-        background-color: #e6f7ff;
-        padding: 10px 15px;
-        border-radius: 15px 15px 0 15px;
-        margin: 5px 0;
-        text-align: right;
-        display: flex;
-        flex-direction: column;
-        align-items: flex-end;
-    }
-    .assistant-message {
-        background-color: #f0f0f0;
-        padding: 10px 15px;
-        border-radius: 15px 15px 15px 0;
-        margin: 5px 0;
-        display: flex;
-        flex-direction: column;
-    }
-    .timestamp {
-        font-size: 0.8em;
-        color: #888;
-        margin-top: 5px;
-    }
-    .chat-container {
-        margin-bottom: 20px;
-        max-height: 70vh;
-        overflow-y: auto;
-        padding: 10px;
-    }
-    .message-content {
-        word-wrap: break-word;
-    }
-</style>
-""", unsafe_allow_html=True)
-
 # App title
 st.title("💬 Chat Application")
 
@@ -71,59 +42,27 @@ if 'chat_history' not in st.session_state:
 
 # Function to add a message to the chat history
 def add_message(role, content):
-    timestamp = datetime.now().strftime("%H:%M:%S")
-    st.session_state.chat_history.append({"role": role, "content": content, "timestamp": timestamp})
-
-# Function to display chat messages
-def display_chat():
-    with st.container():
-        for message in st.session_state.chat_history:
-            if message["role"] == "user":
-                st.markdown(f"""
-                <div class="user-message">
-                    <div class="message-content">{message["content"]}</div>
-                    <div class="timestamp">{message["timestamp"]}</div>
-                </div>
-                """, unsafe_allow_html=True)
-            else:
-                st.markdown(f"""
-                <div class="assistant-message">
-                    <div class="message-content">{message["content"]}</div>
-                    <div class="timestamp">{message["timestamp"]}</div>
-                </div>
-                """, unsafe_allow_html=True)
-
-# User input section
-with st.container():
-    st.markdown('<div class="chat-container">', unsafe_allow_html=True)
-    display_chat()
-    st.markdown('</div>', unsafe_allow_html=True)
-
-    # Input elements arranged horizontally with send button
-    col1, col2 = st.columns([5, 1])
-    
-    with col1:
-        user_input = st.text_input("Type a message...", key="user_input", placeholder="Type your message here...")
-    
-    with col2:
-        send_button = st.button("Send")
-
-# Process user input when the send button is clicked
-if send_button and user_input:
-
-    add_message(role='user', content=user_input.lower())  
-
-    # Simulate processing (you can replace this with actual AI response logic)
-    with st.spinner("Thinking..."):
-
-        response = chatbot.generate_response(user_input)
-        add_message(role="assistant", content=response['response'])
-        
-    st.rerun()
+    st.session_state.chat_history.append({"role": role, "content": content})
+
+# Render the conversation so far; Streamlit's chat primitives only
+# re-render what changed instead of rebuilding the whole DOM per message
+for message in st.session_state.chat_history:
+    with st.chat_message(message["role"]):
+        st.markdown(message["content"])
+
+# Process user input as soon as it is submitted
+if user_input := st.chat_input("Type your message here..."):
+
+    add_message(role="user", content=user_input)
+    with st.chat_message("user"):
+        st.markdown(user_input)
+
+    with st.chat_message("assistant"):
+        response = st.write_stream(chatbot.stream_response(user_input))
+    add_message(role="assistant", content=response)
 
 # Add a clear chat button
 if st.button("Clear Chat"):
     chatbot.clear_memory()
     st.session_state.chat_history = []
     st.rerun()
-
@@ -1,13 +1,17 @@
-from typing import Dict, Any, Optional
+from typing import AsyncIterator, Dict, Any, Iterator, Optional, Tuple
 import logging
+from functools import cached_property
 
 from langchain_google_genai import (
     ChatGoogleGenerativeAI, 
     GoogleGenerativeAIEmbeddings
 )
 
+import chromadb
 from langchain_chroma import Chroma
+from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain.prompts import PromptTemplate
+from langchain.schema import HumanMessage, SystemMessage
 
 from src.utils import ChatbotConfig
 from src.memory import ChatbotMemory
@@ -16,6 +20,20 @@ from src.memory import ChatbotMemory
 logger = logging.getLogger(__name__)
 
 
+_PROMPT_TEMPLATE = PromptTemplate(
+    input_variables=["relevant_memories", "recent_history"],
+    template="""You are a helpful AI assistant with memory of past converstaions.
+
+        Relevant past conversations:
+        {relevant_memories}
+
+        Recent conversation:
+        {recent_history}
+
+        """
+)
+
+
 class EnhancedChatbot:
     """Chatbot with enhanced short-term and long-term memories."""
 
@@ -23,65 +41,107 @@ class EnhancedChatbot:
 
         self.config = config or ChatbotConfig.from_env()
 
-        self.llm = ChatGoogleGenerativeAI(
+        self.prompt_template = _PROMPT_TEMPLATE
+
+        # Cache of the formatted memories/history prefix, which is
+        # O(history) to build and usually unchanged between reruns
+        self._last_prompt_parts = None
+        self._last_prompt_prefix = ""
+
+    # The Gemini clients and the Chroma store (sqlite open + HNSW mmap)
+    # are built lazily, so importing or constructing the chatbot stays
+    # cheap for code paths that never touch them
+
+    @cached_property
+    def llm(self) -> ChatGoogleGenerativeAI:
+        return ChatGoogleGenerativeAI(
             model=self.config.model_name,
             temperature=self.config.temperature,
             google_api_key=self.config.google_api_key
         )
 
-        self.embeddings = GoogleGenerativeAIEmbeddings(
-            model=self.config.embedding_model
+    @cached_property
+    def embeddings(self):
+        if self.config.embedding_model.startswith('models/'):
+            return GoogleGenerativeAIEmbeddings(
+                model=self.config.embedding_model
+            )
+
+        # In-process model: no network round trip or rate limit per
+        # embedding call
+        return HuggingFaceEmbeddings(
+            model_name=self.config.embedding_model,
+            encode_kwargs={"normalize_embeddings": True}
         )
 
-        self.vector_store = Chroma(
+    @cached_property
+    def vector_store(self) -> Chroma:
+        collection_metadata = {
+            "hnsw:space": self.config.hnsw_space,
+            "hnsw:construction_ef": self.config.hnsw_construction_ef,
+            "hnsw:M": self.config.hnsw_m,
+            "hnsw:search_ef": self.config.hnsw_search_ef,
+        }
+
+        if self.config.chroma_host:
+            # Client-server mode: writes from concurrent sessions go over
+            # HTTP to a chroma sidecar instead of serializing on the
+            # embedded sqlite file lock
+            client = chromadb.HttpClient(
+                host=self.config.chroma_host,
+                port=self.config.chroma_port
+            )
+            return Chroma(
+                client=client,
+                collection_name="conversation_memory",
+                embedding_function=self.embeddings,
+                collection_metadata=collection_metadata
+            )
+
+        return Chroma(
             collection_name="conversation_memory",
             embedding_function=self.embeddings,
-            persist_directory=self.config.chroma_persist_dir
+            persist_directory=self.config.chroma_persist_dir,
+            collection_metadata=collection_metadata
         )
 
-        self.memory = ChatbotMemory(
+    @cached_property
+    def memory(self) -> ChatbotMemory:
+        return ChatbotMemory(
             vector_store=self.vector_store,
-            memory_k=self.config.memory_k
+            memory_k=self.config.memory_k,
+            window_k=self.config.short_window_k,
+            min_relevance=self.config.min_relevance
         )
 
-        self.prompt_template = self._create_prompt_template()
+    def _build_messages(self, user_input: str) -> Tuple[list, str]:
+        """Assemble the chat messages from relevant memories and recent history."""
+        relevant_memories = self.memory.get_relevant_memories(user_input)
 
-    def _create_prompt_template(self) -> PromptTemplate:
-        """Create the prompt template for the chatbot."""
+        recent_history = self.get_conversation_history()
 
-        template = """You are a helpful AI assistant with memory of past converstaions.
-        
-        Relevant past conversations:
-        {relevant_memories}
-
-        Recent conversation:
-        {recent_history}
+        # Only reformat the prefix when the memories or history changed
+        if (relevant_memories, recent_history) != self._last_prompt_parts:
+            self._last_prompt_parts = (relevant_memories, recent_history)
+            self._last_prompt_prefix = self.prompt_template.format(
+                relevant_memories=relevant_memories,
+                recent_history=recent_history
+            )
 
-        Human: {user_input}
-        AI Assistant:
-        """
+        messages = [
+            SystemMessage(content=self._last_prompt_prefix),
+            HumanMessage(content=user_input)
+        ]
 
-        return PromptTemplate(
-            input_variables=["relevant_memories", "recent_history", "user_input"],
-            template=template
-        )
+        return messages, relevant_memories
 
     def generate_response(self, user_input: str) -> Dict[str, Any]:
         """Generate a response to user input."""
         try:
-            relevant_memories = self.memory.get_relevant_memories(user_input)
-
-            recent_history = self.memory.get_conversation_history().get('history', '')
-
-
-            prompt = self.prompt_template.format(
-                relevant_memories=relevant_memories,
-                recent_history=recent_history,
-                user_input=user_input
-            )
+            messages, relevant_memories = self._build_messages(user_input)
 
             # Generate response
-            response = self.llm.invoke(prompt)
+            response = self.llm.invoke(messages)
             response = response.content            
 
             # Add to memory
@@ -100,7 +160,50 @@ class EnhancedChatbot:
                 "error": str(e),
                 "success": False
             }
-        
+
+    def stream_response(self, user_input: str) -> Iterator[str]:
+        """Generate a response to user input, yielding tokens as they arrive."""
+        try:
+            messages, _ = self._build_messages(user_input)
+
+            chunks = []
+            for chunk in self.llm.stream(messages):
+                chunks.append(chunk.content)
+                yield chunk.content
+
+            # Add the assembled response to memory
+            self.memory.add_to_memory(user_input, "".join(chunks))
+
+        except Exception as e:
+            logger.error(f"Error streaming response; {e}")
+            yield "I'm sorry, I encountered an error. Please try again."
+
+    async def astream_response(self, user_input: str) -> AsyncIterator[str]:
+        """Async variant of stream_response for FastAPI/SSE scenarios."""
+        try:
+            messages, _ = self._build_messages(user_input)
+
+            chunks = []
+            async for chunk in self.llm.astream(messages):
+                chunks.append(chunk.content)
+                yield chunk.content
+
+            # Add the assembled response to memory
+            self.memory.add_to_memory(user_input, "".join(chunks))
+
+        except Exception as e:
+            logger.error(f"Error streaming response; {e}")
+            yield "I'm sorry, I encountered an error. Please try again."
+
+    @staticmethod
+    def format_conversation_history(history: Dict[str, Any]) -> str:
+        """Format a loaded history mapping as a plain string."""
+        return str(history.get('history', ''))
+
+    def get_conversation_history(self) -> str:
+        """Return the recent conversation history as a string."""
+        return self.format_conversation_history(self.memory.get_conversation_history())
+
     def clear_memory(self) -> None:
         """Clear the chatbot's memory."""                      
         self.memory.clear_short_term_memory()
@@ -1,8 +1,14 @@
-from typing import Dict, Any
+from typing import Dict, Any, List
+import atexit
 import logging
+import queue
+import threading
 from datetime import datetime
+from functools import lru_cache
+from uuid import uuid4
 
-from langchain.memory import ConversationBufferMemory
+from langchain.memory import ConversationBufferWindowMemory
+from langchain.schema import Document
 
 from langchain_chroma import Chroma
 
@@ -11,11 +17,38 @@ logger = logging.getLogger(__name__)
 class ChatbotMemory:
     """Memory management for the chatbot."""
 
-    def __init__(self, vector_store: Chroma, memory_k: int = 3):
+    def __init__(self, vector_store: Chroma, memory_k: int = 3,
+                 batch_size: int = 20, window_k: int = 10,
+                 min_relevance: float = 0.7):
 
         self.vector_store = vector_store
         self.memory_k = memory_k
-        self.short_term_memory = ConversationBufferMemory()
+        self.batch_size = batch_size
+        self.min_relevance = min_relevance
+        # Sliding window keeps the prompt O(1) in conversation length
+        self.short_term_memory = ConversationBufferWindowMemory(k=window_k)
+
+        # Write-behind buffer: turns are collected here and written to the
+        # vector store in one batched add_texts call instead of one
+        # round trip (plus one embedding call) per turn. The instance is
+        # shared across session threads, so the buffer is lock-guarded
+        self._pending_texts = []
+        self._pending_metadatas = []
+        self._buffer_lock = threading.Lock()
+
+        # Full batches are handed to a daemon writer thread so the
+        # embedding call and store round trip never sit on the
+        # response path
+        self._write_queue = queue.Queue()
+        self._writer_thread = threading.Thread(target=self._writer, daemon=True)
+        self._writer_thread.start()
+
+        # Per-instance caches: repeated queries skip the Gemini embedding
+        # round trip, and unchanged corpora skip the ANN search too
+        self._embed_query = lru_cache(maxsize=256)(self._embed_query_uncached)
+        self._search = lru_cache(maxsize=256)(self._search_uncached)
+
+        atexit.register(self.flush)
 
     def add_to_memory(self, human_input: str, ai_response: str) -> None:
         """Add conversation to both short-term and long-term memory"""
@@ -25,36 +58,110 @@ class ChatbotMemory:
             {"input": human_input},
             {"output": ai_response}
         )
-        
+
         # long-term memory
         metadata = {
             "timestamp": datetime.now().isoformat(),
-        }        
+        }
 
         memory_text = f"Human: {human_input}\nAi: {ai_response}"
 
-        self.vector_store.add_texts(
-            texts = [memory_text],
-            metadata = [metadata]
-        )
+        with self._buffer_lock:
+            self._pending_texts.append(memory_text)
+            self._pending_metadatas.append(metadata)
+            batch_full = len(self._pending_texts) >= self.batch_size
+
+        if batch_full:
+            self._enqueue_pending()
+
+    def _enqueue_pending(self) -> None:
+        """Hand the buffered turns to the writer thread as one batch."""
+        with self._buffer_lock:
+            if not self._pending_texts:
+                return
+
+            batch = (self._pending_texts, self._pending_metadatas)
+            self._pending_texts = []
+            self._pending_metadatas = []
+
+        self._write_queue.put(batch)
+
+        # New memories invalidate cached search results (embeddings stay valid)
+        self._search.cache_clear()
+
+    def _writer(self) -> None:
+        """Drain queued batches into the vector store."""
+        while True:
+            texts, metadatas = self._write_queue.get()
+            try:
+                # Embed the batch once and hand the vectors straight to the
+                # collection, so Chroma does not re-embed the documents
+                embeddings = self.vector_store.embeddings.embed_documents(texts)
+                self.vector_store._collection.add(
+                    embeddings=embeddings,
+                    documents=texts,
+                    metadatas=metadatas,
+                    ids=[str(uuid4()) for _ in texts]
+                )
+            except Exception as e:
+                logger.error(f"Error writing memory batch; {e}")
+            finally:
+                self._write_queue.task_done()
+
+    def flush(self) -> None:
+        """Enqueue any buffered turns and wait until they are written."""
+        self._enqueue_pending()
+        self._write_queue.join()
 
     def get_relevant_memories(self, query: str) -> str:
         """Retrieve relevant past conversations."""
+        return self._search(query.strip().lower())
 
-        docs = self.vector_store.similarity_search(query, k=self.memory_k)
+    def _embed_query_uncached(self, query: str):
+        """Embed a query via the store's embedding function."""
+        return self.vector_store.embeddings.embed_query(query)
+
+    def _search_uncached(self, query: str) -> str:
+        """Search the vector store and format the matching memories."""
+
+        query_embedding = self._embed_query(query)
+        pairs = self.vector_store.similarity_search_by_vector_with_relevance_scores(
+            query_embedding, k=self.memory_k
+        )
 
         formated_memories = []
-        for doc in docs:
+        for doc, distance in pairs:
+            # The by-vector search returns raw cosine distances (lower is
+            # more similar); convert to relevance before thresholding, and
+            # skip matches that are not actually relevant rather than
+            # padding the prompt up to memory_k
+            if 1.0 - distance < self.min_relevance:
+                continue
             metadata = doc.metadata
             timestamp = metadata.get("timestamp", "Unknown time")
             formated_memories.append(f"{timestamp}: {doc.page_content}")
 
         return "\n\n".join(formated_memories)
 
+    def get_all_memories(self, limit: int = 1000, offset: int = 0) -> List[Document]:
+        """Return up to limit stored memories, e.g. for export or inspection."""
+        self.flush()
+
+        # Plain paged read from the collection: no query embedding,
+        # no HNSW traversal
+        result = self.vector_store._collection.get(
+            limit=limit, offset=offset, include=["documents", "metadatas"]
+        )
+        return [
+            Document(page_content=document, metadata=metadata or {})
+            for document, metadata in zip(result["documents"], result["metadatas"])
+        ]
+
     def get_conversation_history(self) -> Dict[str, Any]:
         """Get the recent conversation history."""
         return self.short_term_memory.load_memory_variables({})
     
     def clear_short_term_memory(self) -> None:
         """Clear the short-term memory."""
+        self.flush()
         self.short_term_memory.clear()
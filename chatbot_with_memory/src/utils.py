@@ -1,12 +1,38 @@
+import os
 from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ChatbotConfig:
     """Configuration for the chatbot."""
 
     google_api_key: str
     model_name: str = 'gemini-2.0-flash'
     temperature: float = 0.7
-    embedding_model: str = 'models/gemini-embedding-exp-03-07'
+    # Local sentence-transformers model by default; a 'models/...' name
+    # selects Gemini embeddings instead (one API round trip per batch)
+    embedding_model: str = 'minishlab/potion-retrieval-32M'
     chroma_persist_dir: str = './chroma_langchain_db'
-    memory_k: int = 3 # Number of relevant memories to retrieve
\ No newline at end of file
+
+    # When chroma_host is set, talk to a chroma sidecar (chroma run --path ...)
+    # instead of the embedded store, so concurrent sessions don't contend
+    # on the sqlite file lock
+    chroma_host: Optional[str] = None
+    chroma_port: int = 8000
+    memory_k: int = 3 # Number of relevant memories to retrieve
+    min_relevance: float = 0.7 # Drop retrieved memories scoring below this
+    short_window_k: int = 10 # Number of recent turns kept in the prompt
+
+    # HNSW index tuning for the small conversation-memory corpus:
+    # cheaper inserts, predictable search, cosine to match Gemini embeddings
+    hnsw_space: str = 'cosine'
+    hnsw_construction_ef: int = 100
+    hnsw_m: int = 16
+    hnsw_search_ef: int = 32
+
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def from_env() -> "ChatbotConfig":
+        """Build the config from environment variables, once per process."""
+        return ChatbotConfig(google_api_key=os.getenv("GOOGLE_API_KEY"))
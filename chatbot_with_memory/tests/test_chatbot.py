@@ -0,0 +1,22 @@
+
+"""Tests for the chatbot."""
+
+from unittest.mock import Mock
+
+from src.chatbot import EnhancedChatbot
+from src.utils import ChatbotConfig
+
+
+def test_get_conversation_history_returns_string():
+    """The history accessor calls into memory and returns a plain string."""
+    chatbot = EnhancedChatbot(ChatbotConfig(google_api_key="test-key"))
+    chatbot.memory = Mock()
+    chatbot.memory.get_conversation_history.return_value = {
+        "history": "Human: Hi\nAI: Hello"
+    }
+
+    assert chatbot.get_conversation_history() == "Human: Hi\nAI: Hello"
+
+
+def test_format_conversation_history_handles_empty():
+    assert EnhancedChatbot.format_conversation_history({}) == ""
@@ -11,9 +11,11 @@ from src.memory import ChatbotMemory
 def mock_vector_store():
     """Create a mock vector store."""
     mock = Mock()
-    mock.add_texts = MagicMock()
-    mock.similarity_search = MagicMock(return_value=[
-        Document(page_content="Human: Test\nAI: Response")
+    mock._collection.add = MagicMock()
+    mock.embeddings.embed_documents = MagicMock(return_value=[[0.1, 0.2, 0.3]])
+    mock.embeddings.embed_query = MagicMock(return_value=[0.1, 0.2, 0.3])
+    mock.similarity_search_by_vector_with_relevance_scores = MagicMock(return_value=[
+        (Document(page_content="Human: Test\nAI: Response"), 0.1)
     ])
     return mock
 
@@ -36,20 +38,93 @@ def chatbot_memory(mock_vector_store):
 def test_add_to_memory(chatbot_memory, mock_vector_store):
 
     chatbot_memory.add_to_memory("Hello", "Hi there!")
-    
-    # # Check that vector store was called
-    mock_vector_store.add_texts.assert_called_once()
-    call_args = mock_vector_store.add_texts.call_args[1]['texts']
+    chatbot_memory.flush()
+
+    # # Check that the batch was embedded and written to the collection
+    mock_vector_store.embeddings.embed_documents.assert_called_once_with(
+        ["Human: Hello\nAi: Hi there!"]
+    )
+    mock_vector_store._collection.add.assert_called_once()
+    call_args = mock_vector_store._collection.add.call_args[1]['documents']
     assert call_args == ["Human: Hello\nAi: Hi there!"]
 
 
+def test_add_to_memory_batches_writes(mock_vector_store):
+    """Turns are buffered and written in one batched add_texts call."""
+    memory = ChatbotMemory(
+        vector_store=mock_vector_store,
+        memory_k=3,
+        batch_size=3
+    )
+
+    memory.add_to_memory("One", "1")
+    memory.add_to_memory("Two", "2")
+    mock_vector_store._collection.add.assert_not_called()
+
+    memory.add_to_memory("Three", "3")
+    memory.flush()
+    mock_vector_store._collection.add.assert_called_once()
+    call_args = mock_vector_store._collection.add.call_args[1]['documents']
+    assert call_args == [
+        "Human: One\nAi: 1",
+        "Human: Two\nAi: 2",
+        "Human: Three\nAi: 3",
+    ]
+
+
 def test_get_relevant_memories(chatbot_memory, mock_vector_store):
 
     short_mem = chatbot_memory.get_relevant_memories("test query")
     assert short_mem == "Unknown time: Human: Test\nAI: Response"
-    
-    # Check that similarity search was called
-    long_mem = mock_vector_store.similarity_search.assert_called_once_with("test query", k=3)
+
+    # Check that the query was embedded once and searched by vector
+    mock_vector_store.embeddings.embed_query.assert_called_once_with("test query")
+    mock_vector_store.similarity_search_by_vector_with_relevance_scores \
+        .assert_called_once_with([0.1, 0.2, 0.3], k=3)
+
+
+def test_get_relevant_memories_filters_low_scores(mock_vector_store):
+    """Matches below min_relevance are dropped from the prompt."""
+    # Scores are cosine distances: the close match is near 0,
+    # the unrelated one near 1
+    mock_vector_store.similarity_search_by_vector_with_relevance_scores = MagicMock(
+        return_value=[
+            (Document(page_content="Human: Test\nAI: Response"), 0.1),
+            (Document(page_content="Human: Noise\nAI: Noise"), 0.9),
+        ]
+    )
+    memory = ChatbotMemory(
+        vector_store=mock_vector_store,
+        memory_k=3,
+        min_relevance=0.7
+    )
+
+    assert memory.get_relevant_memories("test query") == (
+        "Unknown time: Human: Test\nAI: Response"
+    )
+
+
+def test_get_relevant_memories_is_cached(chatbot_memory, mock_vector_store):
+    """Repeated (or differently-cased) queries hit the store only once."""
+    chatbot_memory.get_relevant_memories("test query")
+    chatbot_memory.get_relevant_memories("Test Query ")
+
+    mock_vector_store.embeddings.embed_query.assert_called_once()
+    mock_vector_store.similarity_search_by_vector_with_relevance_scores \
+        .assert_called_once()
+
+
+def test_get_all_memories_returns_documents(chatbot_memory, mock_vector_store):
+    """Stored memories come back as Documents with their metadata."""
+    mock_vector_store._collection.get = MagicMock(return_value={
+        "documents": ["Human: Hello\nAi: Hi!"],
+        "metadatas": [{"timestamp": "2026-08-27T00:00:00"}],
+    })
+
+    docs = chatbot_memory.get_all_memories(limit=10)
+
+    assert docs[0].page_content == "Human: Hello\nAi: Hi!"
+    assert docs[0].metadata == {"timestamp": "2026-08-27T00:00:00"}
 
 
 def test_get_conversation_history(chatbot_memory):